@@ -0,0 +1,444 @@
+# lmms_eval/tasks/wildvideo/wildvideo_calibration.py
+
+"""
+判分模式的回归 / 校准工具：在冻结的 golden set 上跑多个 WildVideoEvaluator variant，
+并排比较它们和参考分数的偏差，以及速度和成本。
+
+golden set 是 JSONL（可 .gz），每行一个样本，两种格式都接受：
+- {"judge_input": {...}, "ref_score": 0.8}
+- WildVideoSubmissionWriter 写出的 per-sample 记录（question / answer / prediction / type / score），
+  其中 score 作为 ref_score
+
+判分请求通过 ReplayBackend 离线回放：先用 --record 对真实 API 录一次，之后都从录音文件读。
+
+    python -m lmms_eval.tasks.wildvideo.wildvideo_calibration \\
+        --golden golden.jsonl.gz --recordings judge_recordings.jsonl \\
+        --judge_models gpt-4o-mini gpt-4o --price gpt-4o-mini=0.15,0.6
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from lmms_eval.tasks.wildvideo.wildvideo_evals import WildVideoEvaluator
+
+# |score - ref_score| 不超过该值视为一致
+DEFAULT_AGREE_TOL = 0.25
+
+
+def _open_text(path: str, mode: str = "rt"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode.replace("t", ""), encoding="utf-8")
+
+
+def _iter_lines(path: str):
+    f = _open_text(path)
+    try:
+        while True:
+            try:
+                line = f.readline()
+            except (EOFError, zlib.error):
+                print(
+                    f"[WildVideo calib] {path} is truncated (no gzip trailer), "
+                    "read up to the last flush"
+                )
+                return
+            if not line:
+                return
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        f.close()
+
+
+def load_golden_set(path: str) -> List[Dict[str, Any]]:
+    """
+    读 golden set，统一成 [{"judge_input": {...}, "ref_score": float}, ...]。
+    允许读还在写的 *_samples.jsonl.gz：没有 gzip 结尾时读到最后一次 flush 为止，
+    末尾不完整的一行丢弃。
+    """
+    golden: List[Dict[str, Any]] = []
+    skipped = 0
+    for line in _iter_lines(path):
+        try:
+            rec = json.loads(line)
+        except json.JSONDecodeError:
+            print(f"[WildVideo calib] ignore truncated line at the end of {path}")
+            break
+        if "judge_input" in rec:
+            golden.append(
+                {"judge_input": rec["judge_input"], "ref_score": float(rec["ref_score"])}
+            )
+        else:
+            # writer 记录里判分失败的样本 score=0 不是真实参考分，跳过
+            if rec.get("judge_ok") is False:
+                skipped += 1
+                continue
+            ref = rec.get("ref_score", rec.get("score"))
+            golden.append({"judge_input": rec, "ref_score": float(ref)})
+
+    if skipped:
+        print(
+            f"[WildVideo calib] skipped {skipped} golden record(s) with judge_ok=false in {path}"
+        )
+    return golden
+
+
+class ReplayMiss(RuntimeError):
+    pass
+
+
+class _ReplayResponse:
+    def __init__(self, payload: Dict[str, Any]):
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Dict[str, Any]:
+        return self._payload
+
+
+class ReplayBackend:
+    """
+    代替 requests.Session 传给 WildVideoEvaluator（只实现 post）。
+
+    - 回放模式：按 (url, 完整请求 payload) 查录音，返回录下的响应；查不到就抛 ReplayMiss，
+      harness 把这个样本记为未录制，不计入准确率和一致性指标。
+    - 录制模式（record=True）：把请求转发给真实 API，并把响应、耗时追加写进录音文件。
+
+    calls / misses / latency / tokens 是按请求（含 retry）的累计计数，
+    harness 按样本取差值，只看该样本是否调用过 / 是否未录制。
+    """
+
+    def __init__(self, recordings_path: str, record: bool = False, session=None):
+        self.recordings_path = recordings_path
+        self.record = record
+        self._lock = threading.Lock()
+        self._recordings: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(recordings_path):
+            with _open_text(recordings_path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        rec = json.loads(line)
+                        self._recordings[rec["key"]] = rec
+
+        if record and session is None:
+            import requests
+
+            session = requests.Session()
+        self._session = session
+
+        self.calls = 0
+        self.misses = 0
+        self.latency = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @staticmethod
+    def request_key(url: str, data: Dict[str, Any]) -> str:
+        # 整个 payload（model / messages / temperature / max_tokens / response_format ...）
+        # 加上 url 一起 hash，改了任何请求参数的 variant 都不会命中别的录音
+        blob = json.dumps([url, data], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def post(self, url: str, headers=None, json=None, timeout=None) -> _ReplayResponse:
+        # 参数名 json 与 requests.post 保持一致（evaluator 用 json=data 调用）
+        key = self.request_key(url, json)
+
+        with self._lock:
+            rec = self._recordings.get(key)
+            self.calls += 1
+
+        if rec is None and self.record:
+            t0 = time.monotonic()
+            resp = self._session.post(url, headers=headers, json=json, timeout=timeout)
+            resp.raise_for_status()
+            rec = {
+                "key": key,
+                "url": url,
+                "model": json.get("model"),
+                "response": resp.json(),
+                "latency": time.monotonic() - t0,
+            }
+            with self._lock:
+                self._recordings[key] = rec
+                with _open_text(self.recordings_path, "at") as f:
+                    f.write(_json_line(rec))
+
+        if rec is None:
+            with self._lock:
+                self.misses += 1
+            raise ReplayMiss(f"no recorded judge response for request {key}")
+
+        usage = rec["response"].get("usage") or {}
+        with self._lock:
+            self.latency += float(rec.get("latency", 0.0))
+            self.prompt_tokens += int(usage.get("prompt_tokens", 0))
+            self.completion_tokens += int(usage.get("completion_tokens", 0))
+
+        return _ReplayResponse(rec["response"])
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "misses": self.misses,
+                "latency": self.latency,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+
+def _json_line(rec: Dict[str, Any]) -> str:
+    return json.dumps(rec, ensure_ascii=False) + "\n"
+
+
+def _per_type_mean(pairs: List[Tuple[str, float]]) -> Dict[str, float]:
+    sums: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for q_type, s in pairs:
+        sums[q_type] = sums.get(q_type, 0.0) + s
+        counts[q_type] = counts.get(q_type, 0) + 1
+    return {t: sums[t] / counts[t] for t in sums}
+
+
+def evaluate_variant(
+    name: str,
+    evaluator: WildVideoEvaluator,
+    golden: List[Dict[str, Any]],
+    backend: ReplayBackend,
+    price: Optional[Tuple[float, float]] = None,
+    agree_tol: float = DEFAULT_AGREE_TOL,
+) -> Dict[str, Any]:
+    """
+    在 golden set 上跑一个 variant，返回该 variant 的报告。
+
+    打分和汇总与 eval_result 相同（build_prompt -> judge_prompt -> summarize_scores），
+    只是去掉了逐样本的 sleep，速度按录音里的真实 API 耗时统计。
+    没有录音的样本不计入准确率 / 一致性，只在 replay_misses 里报告。
+    price 是 (每 1M 输入 token 美元, 每 1M 输出 token 美元)。
+    """
+    before = backend.snapshot()
+    t0 = time.monotonic()
+
+    scored: List[Tuple[str, float, bool]] = []
+    refs: List[Tuple[str, float]] = []
+    abs_err = 0.0
+    agree = 0
+    agree_binary = 0
+    judge_calls = 0
+    misses = 0
+
+    for idx, item in enumerate(golden):
+        j = item["judge_input"]
+        q_type = j.get("type") or "Unknown"
+        ref = item["ref_score"]
+
+        sample_before = backend.snapshot()
+        score = 0.0
+        ok = True
+        try:
+            # 回放模式下未录制是确定性的，重试只会白白 sleep；录制模式保留默认重试
+            score, _ = evaluator.judge_prompt(
+                evaluator.build_prompt(j),
+                session=backend,
+                maxtry=2 if backend.record else 1,
+            )
+        except Exception as e:
+            ok = False
+            err = e
+        sample_after = backend.snapshot()
+
+        # 按样本计数：retry 不重复算
+        judge_calls += int(sample_after["calls"] > sample_before["calls"])
+        if sample_after["misses"] > sample_before["misses"]:
+            misses += 1
+            continue
+        if not ok:
+            print(f"[WildVideo calib] {name} sample {idx} FAILED, treat as score=0. Error = {err}")
+
+        scored.append((q_type, score, ok))
+        refs.append((q_type, ref))
+        abs_err += abs(score - ref)
+        agree += int(abs(score - ref) <= agree_tol)
+        agree_binary += int((score >= 0.5) == (ref >= 0.5))
+
+    wall = time.monotonic() - t0
+    after = backend.snapshot()
+    usage = {k: after[k] - before[k] for k in after}
+
+    if misses:
+        print(
+            f"[WildVideo calib] {name}: {misses} response(s) not recorded, "
+            f"excluded from accuracy metrics (re-run with --record to fill them)"
+        )
+
+    overall_acc, extra_stats = evaluator.summarize_scores(scored)
+    n = len(scored)
+    # 一个样本都没评到（全部未录制）时准确率类指标记为 None，报告里显示 "-"
+    ref_overall = sum(r for _, r in refs) / n if n else None
+    ref_per_type = _per_type_mean(refs)
+
+    per_type_delta = {
+        t: extra_stats["per_type_acc"].get(t, 0.0) - ref_acc
+        for t, ref_acc in ref_per_type.items()
+    }
+
+    cost = None
+    if price is not None:
+        cost = (
+            usage["prompt_tokens"] * price[0] + usage["completion_tokens"] * price[1]
+        ) / 1e6
+
+    return {
+        "variant": name,
+        "judge_model_name": evaluator.model_name,
+        "overall_acc": overall_acc if n else None,
+        "ref_overall_acc": ref_overall,
+        "overall_delta": overall_acc - ref_overall if n else None,
+        "per_type_acc": extra_stats["per_type_acc"],
+        "ref_per_type_acc": ref_per_type,
+        "per_type_delta": per_type_delta,
+        "agreement": agree / n if n else None,
+        "agreement_binary": agree_binary / n if n else None,
+        "mean_abs_error": abs_err / n if n else None,
+        "evaluated": n,
+        "failed_judged": extra_stats["failed_judged"],
+        "judge_calls": judge_calls,
+        "replay_misses": misses,
+        "judge_seconds": usage["latency"],
+        "wall_seconds": wall,
+        "samples_per_judge_second": n / usage["latency"] if usage["latency"] > 0 else None,
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+        "cost_usd": cost,
+    }
+
+
+def run_calibration(
+    golden: List[Dict[str, Any]],
+    variants: Dict[str, WildVideoEvaluator],
+    backend: ReplayBackend,
+    prices: Optional[Dict[str, Tuple[float, float]]] = None,
+    agree_tol: float = DEFAULT_AGREE_TOL,
+) -> List[Dict[str, Any]]:
+    """
+    variants: {variant 名: evaluator}。variant 可以换 judge 模型、prompt、打分规则等，
+    只要还是 WildVideoEvaluator（或其子类）即可。prices 按 judge_model_name 查。
+    """
+    prices = prices or {}
+    return [
+        evaluate_variant(
+            name,
+            evaluator,
+            golden,
+            backend,
+            price=prices.get(evaluator.model_name),
+            agree_tol=agree_tol,
+        )
+        for name, evaluator in variants.items()
+    ]
+
+
+def format_report(reports: List[Dict[str, Any]]) -> str:
+    """
+    并排打印各 variant：总体指标一张表，per-type 偏差一张表。
+    """
+    def _fmt(v, spec=".4f"):
+        return "-" if v is None else format(v, spec)
+
+    names = [r["variant"] for r in reports]
+    width = max([12] + [len(n) for n in names]) + 2
+
+    rows = [
+        ("overall_acc", "overall_acc", ".4f"),
+        ("ref_overall_acc", "ref_overall_acc", ".4f"),
+        ("overall_delta", "overall_delta", "+.4f"),
+        ("agreement", "agreement", ".4f"),
+        ("agreement_binary", "agreement_binary", ".4f"),
+        ("mean_abs_error", "mean_abs_error", ".4f"),
+        ("evaluated", "evaluated", "d"),
+        ("failed_judged", "failed_judged", "d"),
+        ("replay_misses", "replay_misses", "d"),
+        ("judge_calls", "judge_calls", "d"),
+        ("judge_seconds", "judge_seconds", ".2f"),
+        ("samples/judge_s", "samples_per_judge_second", ".2f"),
+        ("cost_usd", "cost_usd", ".4f"),
+    ]
+
+    lines = ["".ljust(24) + "".join(n.rjust(width) for n in names)]
+    for label, key, spec in rows:
+        lines.append(label.ljust(24) + "".join(_fmt(r[key], spec).rjust(width) for r in reports))
+
+    types = sorted({t for r in reports for t in r["ref_per_type_acc"]})
+    if types:
+        lines.append("")
+        lines.append("per-type delta".ljust(24) + "".join(n.rjust(width) for n in names))
+        for t in types:
+            lines.append(
+                t[:23].ljust(24)
+                + "".join(_fmt(r["per_type_delta"].get(t), "+.4f").rjust(width) for r in reports)
+            )
+
+    return "\n".join(lines)
+
+
+def _parse_price(items: List[str]) -> Dict[str, Tuple[float, float]]:
+    prices: Dict[str, Tuple[float, float]] = {}
+    for item in items:
+        model, _, value = item.partition("=")
+        p_in, _, p_out = value.partition(",")
+        prices[model] = (float(p_in), float(p_out or 0.0))
+    return prices
+
+
+def main() -> None:
+    from lmms_eval.tasks.wildvideo.wildvideo_utils import API_KEY, API_URL, WILDVIDEO_TASKS
+
+    parser = argparse.ArgumentParser(description="Compare WildVideo judge variants on a golden set.")
+    parser.add_argument("--golden", required=True, help="golden set JSONL (.gz ok)")
+    parser.add_argument("--recordings", required=True, help="recorded judge responses JSONL")
+    parser.add_argument("--record", action="store_true", help="call the real API for missing responses and record them")
+    parser.add_argument("--judge_models", nargs="+", default=["gpt-4o-mini"])
+    parser.add_argument(
+        "--task", default="single_en", choices=sorted(WILDVIDEO_TASKS), help="task whose sys_prompt is used"
+    )
+    parser.add_argument("--price", nargs="*", default=[], help="model=usd_per_1M_in,usd_per_1M_out")
+    parser.add_argument("--agree_tol", type=float, default=DEFAULT_AGREE_TOL)
+    parser.add_argument("--output", default=None, help="write the reports as JSON")
+    args = parser.parse_args()
+
+    golden = load_golden_set(args.golden)
+    backend = ReplayBackend(args.recordings, record=args.record)
+    sys_prompt = WILDVIDEO_TASKS[args.task].evaluator.sys_prompt
+
+    variants = {
+        m: WildVideoEvaluator(
+            sys_prompt=sys_prompt, api_key=API_KEY, api_url=API_URL, model_name=m
+        )
+        for m in args.judge_models
+    }
+
+    reports = run_calibration(
+        golden, variants, backend, prices=_parse_price(args.price), agree_tol=args.agree_tol
+    )
+    print(format_report(reports))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
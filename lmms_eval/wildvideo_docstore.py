@@ -0,0 +1,160 @@
+# lmms_eval/tasks/wildvideo/wildvideo_docstore.py
+
+"""
+离线 doc store：把四个 WildVideo config 一次性渲染好，存成一个可 memory-map 的 Arrow 文件。
+
+每一行保留原始字段，另外加上：
+- config：single_en / single_cn / multi_en / multi_cn
+- rendered_prompt：doc_to_text 的结果（多轮已按 round 排序拼好历史）
+- target：标准答案（与 process_results 一致，多轮取最后一轮）
+- video_path：解析好的本地 mp4 路径
+- store_version：构建时的 DOC_STORE_VERSION（模板 / 规则版本），加载时不一致直接报错
+
+构建（需要能访问 HF hub 的机器，只需一次）：
+
+    python -m lmms_eval.tasks.wildvideo.wildvideo_docstore --out /mnt/Data/DATA/huggingface/wildvideo_store
+
+离线跑 wildvideo_*_offline task 即可（YAML 里 dataset_path 指向上面的默认目录，load_from_disk: True）。
+
+load_from_disk 直接 memory-map 这个 Arrow 文件，各节点可以共享同一份只读目录；
+process_docs 按 config 取出连续的行，不会往 store 目录写 cache。
+"""
+
+import argparse
+import os
+from typing import Any, Dict, List, Optional
+
+DATASET_PATH = "yangsongyuan18/wildvideo"
+CONFIGS = ["single_en", "single_cn", "multi_en", "multi_cn"]
+# 与 wildvideo_*_offline.yaml 里的 dataset_path 一致
+DEFAULT_STORE_DIR = "/mnt/Data/DATA/huggingface/wildvideo_store"
+
+
+def select_config(dataset, config_name: str, store_version: str):
+    """
+    process_docs 用：如果是离线 store（带 config 列），只保留该 config 的行；
+    否则（HF hub 上的原始数据）原样返回。
+
+    - store 里同一 config 的行是连续的，select 一个 range 不会生成 indices cache；
+    - store 的 store_version 与当前代码不一致时报错，避免用旧模板渲染的 prompt；
+    - 合表时为其他 config 补出来的全 null 列会去掉，doc.get(k, default) 才能拿到默认值。
+    """
+    if "config" not in dataset.column_names:
+        return dataset
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # 都在 Arrow 上算，不把整列转成 Python 对象
+    versions = (
+        pc.unique(dataset.data.column("store_version")).to_pylist()
+        if "store_version" in dataset.column_names
+        else [None]
+    )
+    if versions != [store_version]:
+        raise RuntimeError(
+            f"WildVideo doc store version {sorted(map(str, versions))} does not match "
+            f"the current code ({store_version}); rebuild it with "
+            f"`python -m lmms_eval.tasks.wildvideo.wildvideo_docstore --out <dir>`."
+        )
+
+    configs = dataset.data.column("config")
+    start = pc.index(configs, pa.scalar(config_name, configs.type)).as_py()
+    if start < 0:
+        return dataset.select([])
+    stop = start + pc.sum(pc.equal(configs, config_name)).as_py()
+    ds = dataset.select(range(start, stop))
+
+    all_null = [
+        c for c in ds.column_names if ds.data.column(c).null_count == ds.num_rows
+    ]
+    if all_null:
+        ds = ds.remove_columns(all_null)
+    return ds
+
+
+def _render_config(
+    config_name: str,
+    dataset_path: str,
+    cache_dir: Optional[str],
+    video_root: Optional[str],
+):
+    import datasets
+
+    from lmms_eval.tasks.wildvideo.wildvideo_utils import (
+        DOC_STORE_VERSION,
+        VIDEO_ROOT,
+        WILDVIDEO_TASKS,
+    )
+
+    task = WILDVIDEO_TASKS[config_name]
+    root = video_root or VIDEO_ROOT
+
+    ds = datasets.load_dataset(
+        dataset_path, config_name, split="test", token=True, cache_dir=cache_dir
+    )
+
+    def _render(doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "config": config_name,
+            "rendered_prompt": task.doc_to_text(doc),
+            "target": task.doc_to_target(doc),
+            "video_path": os.path.join(root, f"{doc.get('video_id')}.mp4"),
+            "store_version": DOC_STORE_VERSION,
+        }
+
+    ds = ds.map(_render, keep_in_memory=True, desc=f"render {config_name}")
+    print(f"[WildVideo docstore] {config_name}: {len(ds)} docs")
+    return ds.data.table
+
+
+def build_doc_store(
+    out_dir: str = DEFAULT_STORE_DIR,
+    dataset_path: str = DATASET_PATH,
+    cache_dir: Optional[str] = None,
+    video_root: Optional[str] = None,
+    configs: List[str] = CONFIGS,
+) -> str:
+    """
+    从 HF hub 拉取各 config，渲染后合成一张表，写成单个 Arrow 文件（DatasetDict 格式，split=test）。
+    """
+    import datasets
+    import pyarrow as pa
+
+    tables = [_render_config(c, dataset_path, cache_dir, video_root) for c in configs]
+
+    # 各 config 的字段不完全一样（单轮没有 rounds 等），缺的列补 null；读取时由 select_config 去掉
+    try:
+        table = pa.concat_tables(tables, promote_options="permissive")
+    except TypeError:
+        table = pa.concat_tables(tables, promote=True)
+
+    store = datasets.DatasetDict({"test": datasets.Dataset(table)})
+    store.save_to_disk(out_dir, num_shards={"test": 1})
+
+    print(f"[WildVideo docstore] wrote {table.num_rows} docs to {out_dir}")
+    return out_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the offline WildVideo doc store.")
+    parser.add_argument("--out", default=DEFAULT_STORE_DIR, help="output directory of the store")
+    parser.add_argument("--dataset_path", default=DATASET_PATH)
+    parser.add_argument("--cache_dir", default=None)
+    parser.add_argument(
+        "--video_root", default=None, help="local video folder, defaults to VIDEO_ROOT in the utils"
+    )
+    parser.add_argument("--configs", nargs="+", default=CONFIGS, choices=CONFIGS)
+    args = parser.parse_args()
+
+    build_doc_store(
+        args.out,
+        dataset_path=args.dataset_path,
+        cache_dir=args.cache_dir,
+        video_root=args.video_root,
+        configs=args.configs,
+    )
+
+
+if __name__ == "__main__":
+    main()
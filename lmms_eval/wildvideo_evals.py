@@ -2,18 +2,30 @@
 
 import json
 import random
+import re
 import time
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 
+# (idx, judge_input, score, ok, raw judge output)
+SampleCallback = Callable[[int, Dict[str, Any], float, bool, Optional[str]], None]
+
 
 class WildVideoEvaluator:
-    def __init__(self, sys_prompt: str, api_key: str, api_url: str, model_name: str):
+    def __init__(
+        self,
+        sys_prompt: str,
+        api_key: str,
+        api_url: str,
+        model_name: str,
+        session: requests.Session | None = None,
+    ):
         self.sys_prompt = sys_prompt
         self.api_key = api_key
         self.api_url = api_url
         self.model_name = model_name
+        self.session = session
 
     def build_prompt(self, item: Dict[str, Any]) -> str:
         question = item.get("question", "")
@@ -43,7 +55,9 @@ class WildVideoEvaluator:
         )
         return prompt
 
-    def _call_judge_model_once(self, prompt: str) -> str:
+    def _call_judge_model_once(
+        self, prompt: str, session: requests.Session | None = None
+    ) -> str:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -58,7 +72,8 @@ class WildVideoEvaluator:
             ],
         }
 
-        resp = requests.post(
+        http = session or self.session or requests
+        resp = http.post(
             self.api_url,
             headers=headers,
             json=data,      
@@ -72,7 +87,12 @@ class WildVideoEvaluator:
         except Exception as e:
             raise RuntimeError(f"Bad response format from judge model: {out}") from e
 
-    def _call_judge_model_with_retry(self, prompt: str, maxtry: int = 2) -> str:
+    def _call_judge_model_with_retry(
+        self,
+        prompt: str,
+        maxtry: int = 2,
+        session: requests.Session | None = None,
+    ) -> str:
         """
         轻量级 retry：最多试几次，不成功就交给外层 eval_result 去记为 failed。
         """
@@ -80,13 +100,15 @@ class WildVideoEvaluator:
 
         for i in range(maxtry):
             try:
-                return self._call_judge_model_once(prompt)
+                return self._call_judge_model_once(prompt, session=session)
             except Exception as e:
                 last_err = e
-                print(
-                    f"[WildVideo judge] request failed (try {i+1}/{maxtry}): {e}"
-                )
-                time.sleep(0.5)
+                # 最后一次失败直接抛出，由调用方记录；maxtry=1 时不打印也不 sleep
+                if i + 1 < maxtry:
+                    print(
+                        f"[WildVideo judge] request failed (try {i+1}/{maxtry}), retrying: {e}"
+                    )
+                    time.sleep(0.5)
 
         raise RuntimeError(f"Judge model failed after {maxtry} tries: {last_err}")
 
@@ -130,21 +152,34 @@ class WildVideoEvaluator:
 
         return 0.0
 
+    def judge_prompt(
+        self,
+        prompt: str,
+        session: requests.Session | None = None,
+        maxtry: int = 2,
+    ) -> Tuple[float, str]:
+        """
+        对单个 prompt 调用判分模型，返回 (score, raw)。
+        重试后仍失败会抛异常，由调用方记为 score=0 并统计 failed。
+        离线回放等不需要重试的场景传 maxtry=1。
+        """
+        raw = self._call_judge_model_with_retry(prompt, maxtry=maxtry, session=session)
+        return float(self._output_to_score(raw)), raw
+
     def eval_result(
-        self, results: List[Dict[str, Any]], eval_method: str = "model"
+        self,
+        results: List[Dict[str, Any]],
+        eval_method: str = "model",
+        on_sample: Optional[SampleCallback] = None,
     ) -> Tuple[float, Dict[str, Any]]:
         """
         把每个样本的 score（0~1 小数或 0/1）做平均，
         同时按 type 统计 per-type 的平均分。
+        on_sample 不为空时，每判完一个样本就回调一次 (idx, judge_input, score, ok, raw)，
+        用于边判边写 per-sample 记录。
         """
 
-        total = 0                 
-        sum_score = 0.0         
-        failed = 0              
-
-        per_type_sum: Dict[str, float] = {}
-        per_type_count: Dict[str, int] = {}
-        per_type_failed: Dict[str, int] = {}
+        scored: List[Tuple[str, float, bool]] = []
 
         for idx, item in enumerate(results):
             j = item.get("judge_input")
@@ -158,27 +193,52 @@ class WildVideoEvaluator:
 
             score = 0.0
             ok = True
+            raw = None
             try:
-                raw = self._call_judge_model_with_retry(prompt)
-                score = float(self._output_to_score(raw))
+                score, raw = self.judge_prompt(prompt)
             except Exception as e:
                 ok = False
-                failed += 1
                 print(
                     f"[WildVideo judge] sample {idx} FAILED, "
                     f"treat as score=0. Error = {e}"
                 )
 
+            scored.append((q_type, score, ok))
+            if on_sample is not None:
+                on_sample(idx, j, score, ok, raw)
+
+            time.sleep(0.1)
+
+        return self.summarize_scores(scored)
+
+    @staticmethod
+    def summarize_scores(
+        scored: List[Tuple[str, float, bool]]
+    ) -> Tuple[float, Dict[str, Any]]:
+        """
+        scored: 按样本顺序的 (type, score, ok) 列表。
+        汇总成 eval_result 的 (overall_acc, extra_stats)，供顺序评测和调度器共用。
+        """
+
+        total = 0                 
+        sum_score = 0.0         
+        failed = 0              
+
+        per_type_sum: Dict[str, float] = {}
+        per_type_count: Dict[str, int] = {}
+        per_type_failed: Dict[str, int] = {}
+
+        for q_type, score, ok in scored:
             total += 1
             sum_score += score
+            if not ok:
+                failed += 1
 
             per_type_sum[q_type] = per_type_sum.get(q_type, 0.0) + score
             per_type_count[q_type] = per_type_count.get(q_type, 0) + 1
             if not ok:
                 per_type_failed[q_type] = per_type_failed.get(q_type, 0) + 1
 
-            time.sleep(0.1)
-
         overall_acc = sum_score / total if total > 0 else 0.0
 
         per_type_acc: Dict[str, float] = {}
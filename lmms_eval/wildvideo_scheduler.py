@@ -0,0 +1,295 @@
+# lmms_eval/tasks/wildvideo/wildvideo_scheduler.py
+
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from lmms_eval.tasks.wildvideo.wildvideo_evals import SampleCallback, WildVideoEvaluator
+
+DEFAULT_MAX_WORKERS = int(os.getenv("WILDVIDEO_JUDGE_WORKERS", "8"))
+# 顺序评测每个样本之后 sleep 0.1s，默认全局速率与其保持一致
+DEFAULT_REQUESTS_PER_SECOND = float(os.getenv("WILDVIDEO_JUDGE_RPS", "10"))
+
+
+class _RateLimiter:
+    """
+    线程安全的全局限速：所有 worker 共享同一个请求预算（每秒最多 rate 个请求）。
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self) -> None:
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _RateLimitedSession(requests.Session):
+    """
+    共享连接池的 Session；每次真正发请求（包括 retry）都先占用一份全局速率预算。
+    """
+
+    def __init__(self, limiter: _RateLimiter, pool_size: int):
+        super().__init__()
+        self._limiter = limiter
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, *args, **kwargs):
+        self._limiter.acquire()
+        return super().request(*args, **kwargs)
+
+
+class _PromptEntry:
+    def __init__(self, evaluator: WildVideoEvaluator, prompt: str, rank: Tuple):
+        self.evaluator = evaluator
+        self.prompt = prompt
+        self.rank = rank
+        self.started = False
+        self.result: Optional[Tuple[float, bool, Optional[str]]] = None
+        # 等待该 prompt 结果的 (job, slot) 列表
+        self.waiters: List[Tuple["_JudgeJob", int]] = []
+
+
+class _JudgeJob:
+    def __init__(
+        self,
+        name: str,
+        evaluator: WildVideoEvaluator,
+        on_sample: Optional[SampleCallback],
+    ):
+        self.name = name
+        self.evaluator = evaluator
+        self.on_sample = on_sample
+        # 每个 slot 对应一个有 judge_input 的样本：(原始 idx, judge_input)
+        self.inputs: List[Tuple[int, Dict[str, Any]]] = []
+        self.slots: List[Optional[Tuple[float, bool, Optional[str]]]] = []
+        self.pending = 0
+        # on_sample 抛出的第一个异常；job 结束时作为 Future 的异常，与 eval_result 里直接抛出一致
+        self.error: Optional[BaseException] = None
+        self.future: Future = Future()
+
+
+class WildVideoJudgeScheduler:
+    """
+    多模型、多任务共享的判分调度器。
+
+    - 接收来自多个 (model, task) 结果集的判分 job（即 aggregate 里的 wrapped_results）；
+    - 同时在判的相同请求（同一 judge 配置 + 同一 prompt）只调用一次，结果分给所有等待的 job；
+      判完即从 _entries 移除，不做长期缓存，之后提交的 job 会重新判（失败也会重试）；
+    - 所有请求共用一个全局速率预算和连接池；
+    - 小 job 或显式指定了更高优先级（priority 越小越优先）的 job 先判；
+    - 每个 job 的 Future 返回与 evaluator.eval_result 完全一致的 (overall_acc, extra_stats)。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    ):
+        self.max_workers = max_workers
+        self.session = _RateLimitedSession(
+            _RateLimiter(requests_per_second), pool_size=max_workers
+        )
+
+        self._lock = threading.Lock()
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._entries: Dict[Tuple[str, str, str, str], _PromptEntry] = {}
+
+        self._workers = [
+            threading.Thread(
+                target=self._worker_loop, name=f"wildvideo-judge-{i}", daemon=True
+            )
+            for i in range(max_workers)
+        ]
+        for t in self._workers:
+            t.start()
+
+    def __enter__(self) -> "WildVideoJudgeScheduler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    @staticmethod
+    def _judge_key(evaluator: WildVideoEvaluator, prompt: str) -> Tuple[str, str, str, str]:
+        return (evaluator.api_url, evaluator.model_name, evaluator.sys_prompt, prompt)
+
+    def submit(
+        self,
+        evaluator: WildVideoEvaluator,
+        results: List[Dict[str, Any]],
+        name: str = "",
+        priority: Optional[int] = None,
+        on_sample: Optional[SampleCallback] = None,
+    ) -> Future:
+        """
+        提交一个判分 job，results 格式与 eval_result 相同（[{"judge_input": ...}, ...]）。
+        priority 不指定时按样本数排序，即小 job 优先；交互式 job 可以传 priority=0。
+        on_sample 与 eval_result 相同，但回调顺序是判完的顺序，不保证按 idx 排列；
+        回调抛异常时不再回调该 job 的后续样本，Future.result() 会抛出这个异常。
+        """
+        job = _JudgeJob(name, evaluator, on_sample)
+        # submit 自己先占一个 pending，保证本函数返回前 job 不会被 worker 提前结束
+        job.pending = 1
+        rank = (priority if priority is not None else len(results), next(self._seq))
+
+        with self._lock:
+            for idx, item in enumerate(results):
+                j = item.get("judge_input")
+                if j is None:
+                    print(
+                        f"[WildVideo judge] {name} sample {idx} has no judge_input, skip."
+                    )
+                    continue
+
+                slot = len(job.slots)
+                job.inputs.append((idx, j))
+                job.slots.append(None)
+
+                prompt = evaluator.build_prompt(j)
+                key = self._judge_key(evaluator, prompt)
+                entry = self._entries.get(key)
+
+                # _entries 里只有还没判完的请求
+                if entry is None:
+                    entry = _PromptEntry(evaluator, prompt, rank)
+                    self._entries[key] = entry
+                    self._queue.put((rank, next(self._seq), key))
+                elif rank < entry.rank:
+                    # 已在队列中但优先级更低：以新优先级再入队一次，worker 会跳过重复项
+                    entry.rank = rank
+                    if not entry.started:
+                        self._queue.put((rank, next(self._seq), key))
+
+                entry.waiters.append((job, slot))
+                job.pending += 1
+
+        self._release([job])
+
+        return job.future
+
+    def run(
+        self, jobs: Dict[str, Tuple[WildVideoEvaluator, List[Dict[str, Any]]]]
+    ) -> Dict[str, Tuple[float, Dict[str, Any]]]:
+        """
+        便捷接口：一次性提交 {name: (evaluator, results)}，阻塞直到全部判完。
+        """
+        futures = {
+            name: self.submit(evaluator, results, name=name)
+            for name, (evaluator, results) in jobs.items()
+        }
+        return {name: fut.result() for name, fut in futures.items()}
+
+    def shutdown(self) -> None:
+        for _ in self._workers:
+            self._queue.put(((float("inf"),), next(self._seq), None))
+        for t in self._workers:
+            t.join()
+
+    def _worker_loop(self) -> None:
+        while True:
+            _, _, key = self._queue.get()
+            if key is None:
+                return
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None or entry.started:
+                    continue
+                entry.started = True
+
+            score = 0.0
+            ok = True
+            raw = None
+            try:
+                score, raw = entry.evaluator.judge_prompt(entry.prompt, session=self.session)
+            except Exception as e:
+                ok = False
+                print(
+                    f"[WildVideo judge] prompt FAILED for "
+                    f"{len(entry.waiters)} sample(s), treat as score=0. Error = {e}"
+                )
+
+            with self._lock:
+                entry.result = (score, ok, raw)
+                waiters, entry.waiters = entry.waiters, []
+                for job, slot in waiters:
+                    job.slots[slot] = entry.result
+                # 判完就移除：内存只随在判请求数增长，失败结果也不会被后来的 job 复用
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+
+            # 先回调 on_sample 再减 pending，job 结束时它的所有 per-sample 回调都已完成
+            self._notify(waiters)
+            self._release([job for job, _ in waiters])
+
+    def _release(self, jobs: List[_JudgeJob]) -> None:
+        finished: List[_JudgeJob] = []
+        with self._lock:
+            for job in jobs:
+                job.pending -= 1
+                if job.pending == 0:
+                    finished.append(job)
+        for job in finished:
+            self._finish_job(job)
+
+    @staticmethod
+    def _notify(ready: List[Tuple[_JudgeJob, int]]) -> None:
+        for job, slot in ready:
+            if job.on_sample is None or job.error is not None:
+                continue
+            idx, j = job.inputs[slot]
+            score, ok, raw = job.slots[slot]
+            try:
+                job.on_sample(idx, j, score, ok, raw)
+            except Exception as e:
+                job.error = e
+
+    @staticmethod
+    def _finish_job(job: _JudgeJob) -> None:
+        scored = [
+            (j.get("type") or "Unknown", score, ok)
+            for (_, j), (score, ok, _) in zip(job.inputs, job.slots)
+        ]
+        if job.name:
+            print(f"[WildVideo judge] job {job.name} finished.")
+        if job.error is not None:
+            job.future.set_exception(job.error)
+            return
+        try:
+            job.future.set_result(job.evaluator.summarize_scores(scored))
+        except Exception as e:
+            job.future.set_exception(e)
+
+
+_shared_scheduler: Optional[WildVideoJudgeScheduler] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_scheduler() -> WildVideoJudgeScheduler:
+    """
+    进程内共享的调度器，四个 task 的 aggregate 共用同一个速率预算和连接池。
+    """
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = WildVideoJudgeScheduler()
+        return _shared_scheduler
@@ -0,0 +1,272 @@
+# lmms_eval/tasks/wildvideo/wildvideo_utils.py
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+from lmms_eval.tasks.wildvideo.wildvideo_docstore import select_config
+from lmms_eval.tasks.wildvideo.wildvideo_evals import WildVideoEvaluator
+from lmms_eval.tasks.wildvideo.wildvideo_scheduler import get_shared_scheduler
+from lmms_eval.tasks.wildvideo.wildvideo_writer import WildVideoSubmissionWriter
+
+VIDEO_ROOT = "/home/yangsongyuan/project/WildVideo/wildvideo/video"
+
+JUDGE_MODEL_NAME = os.getenv("MODEL_VERSION", "gpt-4o-mini")
+API_TYPE = os.getenv("API_TYPE", "openai")
+USE_JUDGE_SCHEDULER = os.getenv("WILDVIDEO_JUDGE_SCHEDULER", "0") == "1"
+
+if API_TYPE == "openai":
+    API_URL = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
+    API_KEY = os.getenv("OPENAI_API_KEY", "YOUR_API_KEY")
+elif API_TYPE == "azure":
+    API_URL = os.getenv("AZURE_ENDPOINT", "https://api.cognitive.microsoft.com/sts/v1.0/issueToken")
+    API_KEY = os.getenv("AZURE_API_KEY", "YOUR_API_KEY")
+else:
+    API_URL = "YOUR_API_URL"
+    API_KEY = "YOUR_API_KEY"
+
+
+# 按语言区分的 prompt 模板，模块加载时定义一次，所有 variant 共用
+PROMPT_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "en": {
+        "single": (
+            "Answer the question based on the given video as concisely and accurately as possible.\n\n"
+            "Question: {question}\n"
+            "Answer:"
+        ),
+        "multi_header": (
+            "Below is the previous conversation and the current question. "
+            "Please answer the final question based on the video.\n"
+        ),
+        "multi_turn": "[Turn {rid}] Q: {question}\n[Turn {rid}] A: {answer}\n",
+        "multi_last": "Current question (Turn {rid}): {question}\nAnswer:",
+    },
+    "cn": {
+        "single": (
+            "请你根据给定的视频内容，尽可能准确、简洁地回答下面的问题。\n\n"
+            "问题：{question}\n"
+            "回答："
+        ),
+        "multi_header": (
+            "下面是关于同一个视频的多轮问答记录。"
+            "请结合「视频内容」和「历史对话」，只回答最后一个问题。\n"
+        ),
+        "multi_turn": "[轮次 {rid}] 问：{question}\n[轮次 {rid}] 答：{answer}\n",
+        "multi_last": (
+            "当前问题（轮次 {rid}）：{question}\n"
+            "请直接用中文回答，不要复述问题。\n回答："
+        ),
+    },
+}
+
+# 离线 doc store 的版本：模板内容自动参与 hash；
+# 改了 doc_to_text / doc_to_target 的渲染规则时把 DOC_STORE_FORMAT 加一，旧 store 会被拒绝
+DOC_STORE_FORMAT = 2
+DOC_STORE_VERSION = "%d-%s" % (
+    DOC_STORE_FORMAT,
+    hashlib.sha1(
+        json.dumps(PROMPT_TEMPLATES, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12],
+)
+
+# (lang, turn_type) -> variant 配置；新增 WildVideo variant 只需在这里加一行
+VARIANTS: Dict[Tuple[str, str], Dict[str, str]] = {
+    ("en", "single"): {
+        "title": "Single-EN",
+        "sys_prompt": "You are an automatic evaluator for WildVideo.",
+    },
+    ("cn", "single"): {
+        "title": "Single-CN",
+        "sys_prompt": "You are an automatic evaluator for WildVideo.",
+    },
+    ("en", "multi"): {
+        "title": "Multi-EN",
+        "sys_prompt": "You are an automatic evaluator for WildVideo multi-turn English QA.",
+    },
+    ("cn", "multi"): {
+        "title": "Multi-CN",
+        "sys_prompt": "你是 WildVideo 的自动评测器，会判断视频问答模型的回答是否可以视为正确。",
+    },
+}
+
+
+def _load_task_config(task: str) -> Dict[str, Any]:
+    config_path = Path(__file__).parent / f"{task}.yaml"
+    if not config_path.exists():
+        return {}
+    with open(config_path, "r") as f:
+        raw_data = f.readlines()
+        safe_data = [line for line in raw_data if "!function" not in line]
+        return yaml.safe_load("".join(safe_data)) or {}
+
+
+def _sorted_rounds(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rounds = doc.get("rounds") or []
+    return sorted(rounds, key=lambda r: r.get("round", 0))
+
+
+class WildVideoTask:
+    """
+    一个 WildVideo variant（lang x turn_type）的全部 lmms_eval 回调。
+    四个 *_utils.py 只是把对应实例的方法按 YAML 里的函数名导出。
+    offline=True 对应 wildvideo_*_offline task：读离线 doc store，
+    metric 名和 submissions/ 下的文件名带 _offline 后缀，不会覆盖在线 task 的输出。
+    """
+
+    def __init__(self, lang: str, turn_type: str, offline: bool = False):
+        self.lang = lang
+        self.turn_type = turn_type
+        self.offline = offline
+        self.name = f"{turn_type}_{lang}"
+        self.task = f"wildvideo_{self.name}" + ("_offline" if offline else "")
+        self.metric = f"{self.task}_acc"
+        self.title = VARIANTS[(lang, turn_type)]["title"] + (" (offline)" if offline else "")
+        self.templates = PROMPT_TEMPLATES[lang]
+
+        # offline YAML include 在线 YAML，metadata 以在线 YAML 为准
+        config = _load_task_config(f"wildvideo_{self.name}")
+        sys_prompt = config.get("metadata", {}).get(
+            "sys_prompt", VARIANTS[(lang, turn_type)]["sys_prompt"]
+        )
+        self.evaluator = WildVideoEvaluator(
+            sys_prompt=sys_prompt,
+            api_key=API_KEY,
+            api_url=API_URL,
+            model_name=JUDGE_MODEL_NAME,
+        )
+
+    def doc_to_visual(self, doc: Dict[str, Any]) -> List[str]:
+        if doc.get("video_path"):
+            return [doc["video_path"]]
+        video_id = doc.get("video_id")
+        video_path = os.path.join(VIDEO_ROOT, f"{video_id}.mp4")
+        return [video_path]
+
+    def process_docs(self, dataset):
+        return select_config(dataset, self.name, DOC_STORE_VERSION)
+
+    def build_multiturn_prompt(self, rounds: List[Dict[str, Any]]) -> str:
+        """
+        多轮 prompt：rounds 已按 round 排好序（_sorted_rounds），
+        前面的轮次作为历史，只回答最后一轮的问题。
+        """
+        history = rounds[:-1]
+        last = rounds[-1]
+
+        parts: List[str] = [self.templates["multi_header"]]
+        for r in history:
+            parts.append(
+                self.templates["multi_turn"].format(
+                    rid=r.get("round", ""),
+                    question=r.get("question", ""),
+                    answer=r.get("answer", ""),
+                )
+            )
+        parts.append(
+            self.templates["multi_last"].format(
+                rid=last.get("round", ""), question=last.get("question", "")
+            )
+        )
+        return "\n".join(parts)
+
+    def doc_to_text(self, doc: Dict[str, Any]) -> str:
+        """
+        - 离线 doc store 里已经渲染好的 prompt 直接返回
+        - 多轮且有 rounds：拼历史对话
+        - 否则用单轮模板
+        """
+        if doc.get("rendered_prompt") is not None:
+            return doc["rendered_prompt"]
+
+        if self.turn_type == "multi":
+            rounds = _sorted_rounds(doc)
+            if rounds:
+                return self.build_multiturn_prompt(rounds)
+
+        return self.templates["single"].format(question=doc.get("question", ""))
+
+    def doc_to_target(self, doc: Dict[str, Any]) -> str:
+        """
+        标准答案，与 process_results 判分用的 gold answer 一致：
+        多轮有 rounds 时取最后一轮的 answer，否则用 doc['answer']。
+        """
+        if self.turn_type == "multi":
+            rounds = _sorted_rounds(doc)
+            if rounds:
+                return str(rounds[-1].get("answer", doc.get("answer", "")) or "").strip()
+
+        return str(doc.get("answer", "") or "")
+
+    def process_results(self, doc: Dict[str, Any], results: List[str]) -> Dict[str, Any]:
+        if doc.get("lang", self.lang) != self.lang:
+            return {}
+        if self.turn_type == "multi" and doc.get("turn_type", "multi") != "multi":
+            return {}
+
+        pred = (results[0] if results else "").strip()
+
+        judge_input = {
+            "video_id": doc.get("video_id"),
+            "question": doc.get("question", ""),
+            "answer": doc.get("answer", ""),
+            "prediction": pred,
+            "lang": doc.get("lang", self.lang),
+            "turn_type": doc.get("turn_type", self.turn_type),
+            "type": doc.get("type", None),
+        }
+
+        if self.turn_type == "multi":
+            rounds = _sorted_rounds(doc)
+            if rounds:
+                last = rounds[-1]
+                judge_input["question"] = last.get("question", doc.get("question", ""))
+                judge_input["answer"] = last.get("answer", doc.get("answer", ""))
+                judge_input["type"] = last.get("type", doc.get("type", None))
+                judge_input["round"] = last.get("round", None)
+            judge_input["path_id"] = doc.get("path_id", None)
+
+        return {self.metric: judge_input}
+
+    def aggregate(self, results, args):
+
+        print(f"============= WildVideo {self.title} (judge model only) =============")
+
+        wrapped_results = [{"judge_input": j} for j in results]
+
+        with WildVideoSubmissionWriter(
+            task=self.task,
+            args=args,
+            lang=self.lang,
+            turn_type=self.turn_type,
+            judge_model_name=JUDGE_MODEL_NAME,
+            api_provider=API_TYPE,
+        ) as writer:
+            if USE_JUDGE_SCHEDULER:
+                overall_acc, extra_stats = get_shared_scheduler().submit(
+                    self.evaluator,
+                    wrapped_results,
+                    name=self.task,
+                    on_sample=writer.write_sample,
+                ).result()
+            else:
+                overall_acc, extra_stats = self.evaluator.eval_result(
+                    wrapped_results,
+                    eval_method="model",
+                    on_sample=writer.write_sample,
+                )
+
+            writer.finalize(overall_acc, extra_stats)
+
+        return overall_acc
+
+
+WILDVIDEO_TASKS: Dict[str, WildVideoTask] = {}
+WILDVIDEO_OFFLINE_TASKS: Dict[str, WildVideoTask] = {}
+for _lang, _turn_type in VARIANTS:
+    _t = WildVideoTask(_lang, _turn_type)
+    WILDVIDEO_TASKS[_t.name] = _t
+    WILDVIDEO_OFFLINE_TASKS[_t.name] = WildVideoTask(_lang, _turn_type, offline=True)
@@ -0,0 +1,145 @@
+# lmms_eval/tasks/wildvideo/wildvideo_writer.py
+
+import datetime
+import gzip
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from lmms_eval.tasks._task_utils.file_utils import generate_submission_file
+
+# 每写多少条 per-sample 记录 flush 一次，中途中断时已 flush 的部分可以读出来。
+# 注意 close 之前文件没有 gzip 结尾：zcat 会报 "unexpected end of file"（用 zcat 2>/dev/null），
+# Python gzip 逐行读到末尾会抛 EOFError，需要自己 catch
+FLUSH_EVERY = 32
+
+_TURN_DESC = {"single": "single-turn", "multi": "multi-turn"}
+_LANG_DESC = {"en": "English", "cn": "Chinese"}
+
+
+class WildVideoSubmissionWriter:
+    """
+    边判分边写结果：
+
+    - {task}_samples.jsonl.gz：append-only 的 per-sample 判分记录，每行一个 JSON；
+    - {task}_results.json：判分结束后写出的汇总，格式与 submission_template.json 一致。
+
+    per-sample 记录直接落盘，不在内存里累积；write_sample 可以直接作为 eval_result 的 on_sample 回调。
+    用 with 使用：判分中途抛异常时也会关闭 .jsonl.gz，保证文件带完整的 gzip 结尾。
+    """
+
+    def __init__(
+        self,
+        task: str,
+        args: Any,
+        lang: str,
+        turn_type: str,
+        judge_model_name: str,
+        api_provider: str,
+    ):
+        self.task = task
+        self.args = args
+        self.lang = lang
+        self.turn_type = turn_type
+        self.judge_model_name = judge_model_name
+        self.api_provider = api_provider
+
+        self.samples_file = generate_submission_file(f"{task}_samples.jsonl.gz", args)
+        self.results_file = generate_submission_file(f"{task}_results.json", args)
+
+        self._lock = threading.Lock()
+        self._fh = gzip.open(self.samples_file, "wt", encoding="utf-8")
+        self._unflushed = 0
+        self.num_written = 0
+
+    def __enter__(self) -> "WildVideoSubmissionWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+    def write_sample(
+        self,
+        idx: int,
+        judge_input: Dict[str, Any],
+        score: float,
+        ok: bool,
+        raw: Optional[str],
+    ) -> None:
+        record = {
+            "idx": idx,
+            "video_id": judge_input.get("video_id"),
+            "type": judge_input.get("type") or "Unknown",
+            "lang": judge_input.get("lang", self.lang),
+            "turn_type": judge_input.get("turn_type", self.turn_type),
+            "question": judge_input.get("question", ""),
+            "answer": judge_input.get("answer", ""),
+            "prediction": judge_input.get("prediction", ""),
+            "score": score,
+            "judge_ok": ok,
+            "judge_raw": raw,
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            self._fh.write(line)
+            self.num_written += 1
+            self._unflushed += 1
+            if self._unflushed >= FLUSH_EVERY:
+                self._fh.flush()
+                self._unflushed = 0
+
+    def finalize(self, overall_acc: float, extra_stats: Dict[str, Any]) -> str:
+        """
+        关闭 per-sample 文件并写出汇总 JSON，返回汇总文件路径。
+        """
+        self.close()
+
+        # 只写能从 args 拿到的 model_info，模板里的占位字段（model_size 等）不输出
+        model_info: Dict[str, Any] = {}
+        if getattr(self.args, "model", None):
+            model_info["model_name"] = self.args.model
+        if getattr(self.args, "model_args", None):
+            model_info["notes"] = self.args.model_args
+
+        summary = {
+            "task": self.task,
+            "split": "test",
+            "lang": self.lang,
+            "model_info": model_info,
+            "judge_info": {
+                "judge_type": "LLM-as-a-judge",
+                "judge_model_name": self.judge_model_name,
+                "sys_prompt_version": "v1.0",
+                "api_provider": self.api_provider,
+            },
+            "metric": {
+                "name": f"{self.task}_acc",
+                "value": overall_acc,
+                "description": (
+                    "Average judge score in [0,1] on WildVideo "
+                    f"{_TURN_DESC.get(self.turn_type, self.turn_type)} "
+                    f"{_LANG_DESC.get(self.lang, self.lang)} test split."
+                ),
+            },
+            "extra_stats": extra_stats,
+            "run_meta": {
+                "date": datetime.date.today().isoformat(),
+                "codebase": "lmms_eval",
+                "wildvideo_version": "v1.0",
+            },
+        }
+
+        with open(self.results_file, "w") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        print(
+            f"[WildVideo judge] wrote {self.num_written} sample records to "
+            f"{self.samples_file}, summary to {self.results_file}"
+        )
+        return self.results_file